@@ -34,9 +34,9 @@ use crate::{
     error::ServerError,
     mcp, middleware,
     payload::{
-        JsonRpcError, JsonRpcRequest, JsonRpcResponse, JsonRpcResponseOrNotification,
-        RegularMessageResponse, SandboxMetricsGetParams, SandboxStartParams, SandboxStopParams,
-        JSONRPC_VERSION,
+        JsonRpcError, JsonRpcRequest, JsonRpcRequestOrBatch, JsonRpcResponse,
+        JsonRpcResponseOrNotification, RegularMessageResponse, SandboxMetricsGetParams,
+        SandboxStartParams, SandboxStopParams, JSONRPC_VERSION,
     },
     state::AppState,
     SandboxStatus, SandboxStatusResponse, ServerResult,
@@ -100,12 +100,76 @@ pub async fn mcp_handler(
     }
 }
 
-/// Main JSON-RPC handler that dispatches to the appropriate method
+/// Main JSON-RPC handler that accepts a single request or a batch of requests
+///
+/// Batch requests are dispatched one after another in the order they were sent, so
+/// stateful calls like consecutive `sandbox.repl.run` executions observe each other.
+/// As in JSON-RPC 2.0, an empty batch gets a single Invalid Request error, and
+/// notifications (entries without an id) are processed but get no response entry.
 #[debug_handler]
 pub async fn json_rpc_handler(
     State(state): State<AppState>,
-    Json(request): Json<JsonRpcRequest>,
-) -> ServerResult<impl IntoResponse> {
+    Json(payload): Json<JsonRpcRequestOrBatch>,
+) -> ServerResult<Response> {
+    match payload {
+        JsonRpcRequestOrBatch::Single(request) => {
+            Ok(dispatch_rpc_request(state, request).await?.into_response())
+        }
+        JsonRpcRequestOrBatch::Batch(requests) => {
+            if requests.is_empty() {
+                let error = JsonRpcError {
+                    code: -32600,
+                    message: "Invalid Request: empty batch".to_string(),
+                    data: None,
+                };
+                return Ok((
+                    StatusCode::OK,
+                    Json(JsonRpcResponse::error(error, Some(serde_json::Value::Null))),
+                )
+                    .into_response());
+            }
+
+            let mut responses = Vec::with_capacity(requests.len());
+            for request in requests {
+                let id = request.id.clone();
+                let response = match dispatch_rpc_request(state.clone(), request).await {
+                    Ok((_, Json(response))) => response,
+                    Err(e) => {
+                        // Report the failure for this entry without aborting the rest of the batch
+                        let code = match e {
+                            ServerError::ValidationError(_) => -32602,
+                            _ => -32603,
+                        };
+                        let error = JsonRpcError {
+                            code,
+                            message: e.to_string(),
+                            data: None,
+                        };
+                        JsonRpcResponse::error(error, id.clone())
+                    }
+                };
+
+                // Notifications are processed but not answered
+                if id.is_some() {
+                    responses.push(response);
+                }
+            }
+
+            // A batch of notifications only gets an empty body, as for a single notification
+            if responses.is_empty() {
+                return Ok(StatusCode::OK.into_response());
+            }
+
+            Ok((StatusCode::OK, Json(responses)).into_response())
+        }
+    }
+}
+
+/// Dispatches a single JSON-RPC request to the appropriate method
+async fn dispatch_rpc_request(
+    state: AppState,
+    request: JsonRpcRequest,
+) -> ServerResult<(StatusCode, Json<JsonRpcResponse>)> {
     debug!(?request, "Received JSON-RPC request");
 
     // Check for required JSON-RPC fields
@@ -1081,3 +1145,171 @@ fn validate_namespace(namespace: &str) -> ServerResult<()> {
 
     Ok(())
 }
+
+//--------------------------------------------------------------------------------------------------
+// Tests
+//--------------------------------------------------------------------------------------------------
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{config::Config, port::PortManager};
+    use serde_json::Value;
+    use std::sync::Arc;
+    use tempfile::tempdir;
+    use tokio::sync::RwLock;
+
+    async fn test_state(namespace_dir: PathBuf) -> AppState {
+        let config = Arc::new(
+            Config::new(
+                None,
+                "127.0.0.1".to_string(),
+                0,
+                Some(namespace_dir.clone()),
+                true,
+            )
+            .unwrap(),
+        );
+        let port_manager = PortManager::new(namespace_dir).await.unwrap();
+
+        AppState::new(config, Arc::new(RwLock::new(port_manager)))
+    }
+
+    async fn call_json_rpc(state: AppState, body: Value) -> (StatusCode, Value) {
+        let payload: JsonRpcRequestOrBatch = serde_json::from_value(body).unwrap();
+        let response = json_rpc_handler(State(state), Json(payload)).await.unwrap();
+
+        let status = response.status();
+        let bytes = axum::body::to_bytes(response.into_body(), usize::MAX)
+            .await
+            .unwrap();
+
+        // Requests that get no JSON-RPC response are answered with an empty body
+        if bytes.is_empty() {
+            return (status, Value::Null);
+        }
+
+        (status, serde_json::from_slice(&bytes).unwrap())
+    }
+
+    #[tokio::test]
+    async fn test_json_rpc_batch_with_mixed_results() {
+        let dir = tempdir().unwrap();
+        let state = test_state(dir.path().to_path_buf()).await;
+
+        let (status, body) = call_json_rpc(
+            state,
+            json!([
+                {
+                    "jsonrpc": "2.0",
+                    "method": "sandbox.metrics.get",
+                    "params": { "namespace": "*" },
+                    "id": 1
+                },
+                {
+                    "jsonrpc": "2.0",
+                    "method": "sandbox.stop",
+                    "params": { "namespace": "default" },
+                    "id": 2
+                },
+                {
+                    "jsonrpc": "2.0",
+                    "method": "sandbox.unknown",
+                    "params": {},
+                    "id": 3
+                }
+            ]),
+        )
+        .await;
+
+        // The batch succeeds as a whole, with one response slot per request in order
+        assert_eq!(status, StatusCode::OK);
+        let responses = body.as_array().unwrap();
+        assert_eq!(responses.len(), 3);
+
+        assert_eq!(responses[0]["id"], 1);
+        assert_eq!(responses[0]["result"]["sandboxes"], json!([]));
+        assert!(responses[0].get("error").is_none());
+
+        // A handler error is reported in its own slot instead of failing the batch, with
+        // invalid params reported as such
+        assert_eq!(responses[1]["id"], 2);
+        assert_eq!(responses[1]["error"]["code"], -32602);
+        assert!(responses[1].get("result").is_none());
+
+        assert_eq!(responses[2]["id"], 3);
+        assert_eq!(responses[2]["error"]["code"], -32601);
+    }
+
+    #[tokio::test]
+    async fn test_json_rpc_empty_batch_is_invalid() {
+        let dir = tempdir().unwrap();
+        let state = test_state(dir.path().to_path_buf()).await;
+
+        let (status, body) = call_json_rpc(state, json!([])).await;
+
+        // An empty batch gets a single error response rather than an empty array
+        assert_eq!(status, StatusCode::OK);
+        assert_eq!(body["error"]["code"], -32600);
+        assert_eq!(body["id"], Value::Null);
+        assert!(body.get("id").is_some());
+    }
+
+    #[tokio::test]
+    async fn test_json_rpc_batch_skips_notifications() {
+        let dir = tempdir().unwrap();
+        let state = test_state(dir.path().to_path_buf()).await;
+
+        let notification = json!({
+            "jsonrpc": "2.0",
+            "method": "sandbox.metrics.get",
+            "params": { "namespace": "*" }
+        });
+
+        let (status, body) = call_json_rpc(
+            state.clone(),
+            json!([
+                notification,
+                {
+                    "jsonrpc": "2.0",
+                    "method": "sandbox.metrics.get",
+                    "params": { "namespace": "*" },
+                    "id": 1
+                }
+            ]),
+        )
+        .await;
+
+        // Only the request with an id is answered
+        assert_eq!(status, StatusCode::OK);
+        let responses = body.as_array().unwrap();
+        assert_eq!(responses.len(), 1);
+        assert_eq!(responses[0]["id"], 1);
+
+        // A batch of notifications gets no JSON-RPC response at all
+        let (status, body) = call_json_rpc(state, json!([notification, notification])).await;
+        assert_eq!(status, StatusCode::OK);
+        assert_eq!(body, Value::Null);
+    }
+
+    #[tokio::test]
+    async fn test_json_rpc_single_request_is_not_wrapped() {
+        let dir = tempdir().unwrap();
+        let state = test_state(dir.path().to_path_buf()).await;
+
+        let (status, body) = call_json_rpc(
+            state,
+            json!({
+                "jsonrpc": "2.0",
+                "method": "sandbox.metrics.get",
+                "params": { "namespace": "*" },
+                "id": 1
+            }),
+        )
+        .await;
+
+        assert_eq!(status, StatusCode::OK);
+        assert_eq!(body["id"], 1);
+        assert_eq!(body["result"]["sandboxes"], json!([]));
+    }
+}
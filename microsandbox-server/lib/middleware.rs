@@ -119,17 +119,18 @@ pub async fn auth_middleware(
         .await
         .map_err(|e| ServerError::InternalError(format!("Failed to read request body: {}", e)))?;
 
-    // Parse the JSON-RPC request and extract the namespace
-    let namespace_from_request = extract_namespace_from_json_rpc(&bytes)?;
-
-    // Validate that the token has access to the requested namespace
-    if claims.namespace != namespace_from_request {
-        return Err(ServerError::AuthorizationError(
-            crate::error::AuthorizationError::AccessDenied(format!(
-                "Token does not have access to namespace '{}'",
-                namespace_from_request
-            )),
-        ));
+    // Parse the JSON-RPC request and extract the namespace. An empty batch targets no
+    // namespace and is answered by the handler with an Invalid Request error.
+    if let Some(namespace_from_request) = extract_namespace_from_json_rpc(&bytes)? {
+        // Validate that the token has access to the requested namespace
+        if claims.namespace != namespace_from_request {
+            return Err(ServerError::AuthorizationError(
+                crate::error::AuthorizationError::AccessDenied(format!(
+                    "Token does not have access to namespace '{}'",
+                    namespace_from_request
+                )),
+            ));
+        }
     }
 
     // Reconstruct the request with the original body
@@ -191,7 +192,7 @@ pub async fn mcp_smart_auth_middleware(
 
     if requires_namespace_validation {
         // Extract namespace from params for tool execution methods
-        let namespace_from_request = extract_namespace_from_json_rpc(&bytes)?;
+        let namespace_from_request = extract_namespace_from_json_rpc(&bytes)?.unwrap_or_default();
 
         // Validate that the token has access to the requested namespace
         if claims.namespace != namespace_from_request {
@@ -217,7 +218,10 @@ pub async fn mcp_smart_auth_middleware(
 //--------------------------------------------------------------------------------------------------
 
 /// Extract the namespace from a JSON-RPC request body
-fn extract_namespace_from_json_rpc(bytes: &[u8]) -> Result<String, ServerError> {
+///
+/// For batch requests every entry must target the same namespace. Returns `None` for an
+/// empty batch, which targets no namespace.
+fn extract_namespace_from_json_rpc(bytes: &[u8]) -> Result<Option<String>, ServerError> {
     // Parse the request body as JSON
     let json_value: Value = serde_json::from_slice(bytes).map_err(|e| {
         ServerError::ValidationError(ValidationError::InvalidInput(format!(
@@ -226,6 +230,29 @@ fn extract_namespace_from_json_rpc(bytes: &[u8]) -> Result<String, ServerError>
         )))
     })?;
 
+    let Some(requests) = json_value.as_array() else {
+        return extract_namespace_from_request(&json_value).map(Some);
+    };
+
+    let mut namespace: Option<String> = None;
+    for request in requests {
+        let request_namespace = extract_namespace_from_request(request)?;
+        match &namespace {
+            Some(ns) if *ns != request_namespace => {
+                return Err(ServerError::ValidationError(ValidationError::InvalidInput(
+                    "All requests in a JSON-RPC batch must use the same namespace".to_string(),
+                )));
+            }
+            Some(_) => {}
+            None => namespace = Some(request_namespace),
+        }
+    }
+
+    Ok(namespace)
+}
+
+/// Extract the namespace from a single JSON-RPC request object
+fn extract_namespace_from_request(json_value: &Value) -> Result<String, ServerError> {
     // Extract the method for logging purposes
     let method = json_value
         .get("method")
@@ -44,6 +44,17 @@ pub struct JsonRpcRequest {
     pub id: Option<Value>,
 }
 
+/// A single JSON-RPC request or a batch of requests sent as one array
+#[derive(Debug, Deserialize)]
+#[serde(untagged)]
+pub enum JsonRpcRequestOrBatch {
+    /// A single request object
+    Single(JsonRpcRequest),
+
+    /// A batch of request objects, processed in order
+    Batch(Vec<JsonRpcRequest>),
+}
+
 /// JSON-RPC notification structure (no id field, no response expected)
 #[derive(Debug, Deserialize, Serialize)]
 pub struct JsonRpcNotification {
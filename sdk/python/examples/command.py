@@ -5,7 +5,6 @@ Example demonstrating how to use sandbox.command.run to execute shell commands.
 
 import asyncio
 
-import aiohttp
 from microsandbox import PythonSandbox
 
 
@@ -132,7 +131,6 @@ async def explicit_lifecycle_example():
 
     # Create sandbox without context manager
     sandbox = PythonSandbox(name="explicit-lifecycle")
-    sandbox._session = aiohttp.ClientSession()
 
     try:
         # Manually start the sandbox
@@ -147,10 +145,9 @@ async def explicit_lifecycle_example():
         print(f"Date: {await date_cmd.output()}")
 
     finally:
-        # Manually stop the sandbox and close session
+        # Manually stop the sandbox
         print("Stopping sandbox...")
         await sandbox.stop()
-        await sandbox._session.close()
 
 
 async def main():
@@ -6,7 +6,6 @@ Example demonstrating how to retrieve sandbox metrics.
 import asyncio
 import time
 
-import aiohttp
 from microsandbox import PythonSandbox
 
 
@@ -30,24 +29,21 @@ async def basic_metrics_example():
         print("\nGetting individual metrics for this sandbox:")
 
         try:
-            # Get CPU usage
-            cpu = await sandbox.metrics.cpu()
+            # The metrics are independent, so request them concurrently
+            cpu, memory, disk, running = await asyncio.gather(
+                sandbox.metrics.cpu(),
+                sandbox.metrics.memory(),
+                sandbox.metrics.disk(),
+                sandbox.metrics.is_running(),
+            )
+
             # CPU metrics may be 0.0 when idle or None if unavailable
             if cpu is None:
                 print("CPU Usage: Not available")
             else:
                 print(f"CPU Usage: {cpu}%")
-
-            # Get memory usage
-            memory = await sandbox.metrics.memory()
             print(f"Memory Usage: {memory or 'Not available'} MiB")
-
-            # Get disk usage
-            disk = await sandbox.metrics.disk()
             print(f"Disk Usage: {disk or 'Not available'} bytes")
-
-            # Check if running
-            running = await sandbox.metrics.is_running()
             print(f"Is Running: {running}")
         except RuntimeError as e:
             print(f"Error getting metrics: {e}")
@@ -223,7 +219,6 @@ async def error_handling_example():
     try:
         # Now properly start the sandbox
         print("\nStarting the sandbox properly...")
-        sandbox._session = aiohttp.ClientSession()
         await sandbox.start()
 
         # Get metrics after starting
@@ -237,8 +232,6 @@ async def error_handling_example():
         # Clean up
         if sandbox._is_started:
             await sandbox.stop()
-        if sandbox._session and not sandbox._session.closed:
-            await sandbox._session.close()
 
 
 async def main():
@@ -20,7 +20,6 @@ Note: If authentication is enabled on the server, set MSB_API_KEY in your enviro
 
 import asyncio
 
-import aiohttp
 from microsandbox import PythonSandbox
 
 
@@ -47,9 +46,6 @@ async def example_explicit_lifecycle():
         server_url="http://127.0.0.1:5555", name="sandbox-explicit"
     )
 
-    # Create HTTP session
-    sandbox._session = aiohttp.ClientSession()
-
     try:
         # Start with resource constraints
         await sandbox.start(
@@ -57,10 +53,14 @@ async def example_explicit_lifecycle():
             cpus=2.0,  # 2 CPU cores
         )
 
-        # Run multiple code blocks with variable assignments
-        await sandbox.run("x = 42")
-        await sandbox.run("y = [i**2 for i in range(10)]")
-        execution3 = await sandbox.run("print(f'x = {x}')\nprint(f'y = {y}')")
+        # Run multiple code blocks with variable assignments in a single request
+        *_, execution3 = await sandbox.run_many(
+            [
+                "x = 42",
+                "y = [i**2 for i in range(10)]",
+                "print(f'x = {x}')\nprint(f'y = {y}')",
+            ]
+        )
 
         print("Output:", await execution3.output())
 
@@ -76,7 +76,6 @@ async def example_explicit_lifecycle():
     finally:
         # Cleanup
         await sandbox.stop()
-        await sandbox._session.close()
 
 
 async def example_execution_chaining():
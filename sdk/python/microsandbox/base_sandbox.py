@@ -3,18 +3,404 @@ Base sandbox implementation for the Microsandbox Python SDK.
 """
 
 import asyncio
+import atexit
+import importlib
+import inspect
+import itertools
+import json
 import os
+import random
+import sys
 import uuid
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Any, AsyncGenerator, Awaitable, Dict, List, Optional, Set, Tuple
 
-import aiohttp
-from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .command import Command
+from .execution import Execution
 from .metrics import Metrics
 
+# Caller-provided HTTP sessions set with configure(), keyed by transport
+_CONFIGURED_SESSIONS: Dict[str, Any] = {}
+
+# SDK-managed HTTP sessions shared by the sandboxes of one event loop, keyed by loop and
+# transport. A session stays open while its loop runs, so sandboxes created one after
+# another reuse its connections, and is closed when the loop shuts down.
+_LOOP_SESSIONS: Dict[Tuple[asyncio.AbstractEventLoop, str], Any] = {}
+
+# Per-loop async generators whose finalization closes the loop's shared sessions
+_LOOP_SESSION_GUARDS: Dict[asyncio.AbstractEventLoop, AsyncGenerator[None, None]] = {}
+
+# Supported HTTP transports
+_TRANSPORTS = ("aiohttp", "httpx")
+
+# Default connection pool size, overridable with MSB_POOL_SIZE / MSB_POOL_PER_HOST
+_DEFAULT_POOL_SIZE = 64
+
+# Seconds an idle keep-alive connection is kept in the pool
+_KEEPALIVE_TIMEOUT = 60
+
+# Default total timeout in seconds for a request, matching aiohttp's default
+_REQUEST_TIMEOUT = 300
+
+# Source of JSON-RPC request ids, which only need to be unique among in-flight requests
+_RPC_IDS = itertools.count(1)
+
+# Maximum number of executions kept per sandbox when run caching is enabled
+_RUN_CACHE_SIZE = 128
+
+# Retries for requests that fail before reaching the server, and the backoff between them
+_MAX_RETRIES = 3
+_BASE_BACKOFF = 0.05
+_MAX_BACKOFF = 1.0
+
+# Statuses with which the server declines a request without processing it
+_RETRYABLE_STATUSES = (503,)
+
+# Seconds to wait for more run() calls before sending a coalesced batch
+_COALESCE_WINDOW = 0.001
+
+# aiohttp module, imported on first use by _get_aiohttp()
+_aiohttp = None
+
+# Whether the .env file has already been loaded in this process
+_DOTENV_LOADED = False
+
+# Started sandboxes waiting to be handed out by create(), keyed by class, event loop and
+# configuration, since a sandbox's HTTP session can only be used on the loop it started on
+_WARM_POOL: Dict[Tuple[Any, ...], List["BaseSandbox"]] = {}
+
+
+def _load_dotenv_once() -> None:
+    """
+    Load the .env file the first time a sandbox is created.
+
+    The file is only read when MSB_API_KEY is not already set, and at most once per
+    process, since locating and parsing it again would yield the same values.
+    """
+    global _DOTENV_LOADED
+
+    # Only try to load .env if MSB_API_KEY is not already set
+    if _DOTENV_LOADED or "MSB_API_KEY" in os.environ:
+        return
+
+    _DOTENV_LOADED = True
+    from dotenv import load_dotenv
+
+    # Ignore errors if .env file doesn't exist
+    try:
+        load_dotenv()
+    except Exception:
+        pass
+
+
+class _RetryableError(RuntimeError):
+    """
+    A request failure that happened before the server processed the request.
+    """
+
+
+class _DisconnectedError(_RetryableError):
+    """
+    A request failure where the connection dropped after the request may have been sent.
+
+    Only retried for idempotent requests, since the server may have processed it.
+    """
+
+
+def _get_aiohttp() -> Any:
+    """
+    Import aiohttp on first use, so importing the SDK doesn't pay for it.
+
+    Returns:
+        The aiohttp module
+    """
+    global _aiohttp
+
+    if _aiohttp is None:
+        _aiohttp = importlib.import_module("aiohttp")
+    return _aiohttp
+
+
+def _create_session(transport: str = "aiohttp", pool_size: Optional[int] = None) -> Any:
+    """
+    Create an HTTP session with a connection pool sized for concurrent sandboxes.
+
+    Args:
+        transport: HTTP transport to create the session for ("aiohttp" or "httpx")
+        pool_size: Maximum number of connections. If not provided, it will be read from
+            the MSB_POOL_SIZE and MSB_POOL_PER_HOST environment variables.
+
+    Returns:
+        A new aiohttp client session, or an httpx async client with HTTP/2 enabled
+    """
+    if pool_size is None:
+        limit = int(os.environ.get("MSB_POOL_SIZE", _DEFAULT_POOL_SIZE))
+        limit_per_host = int(os.environ.get("MSB_POOL_PER_HOST", limit))
+    else:
+        limit = limit_per_host = pool_size
+
+    if transport == "httpx":
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError(
+                "The httpx transport requires the http2 extra: pip install 'microsandbox[http2]'"
+            ) from e
+
+        # A single HTTP/2 connection multiplexes concurrent requests, so the
+        # connection limit only matters for HTTP/1.1 servers
+        return httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=limit,
+                max_keepalive_connections=limit,
+                keepalive_expiry=_KEEPALIVE_TIMEOUT,
+            ),
+            timeout=_REQUEST_TIMEOUT,
+        )
+
+    aiohttp = _get_aiohttp()
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=_KEEPALIVE_TIMEOUT,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def _gather_limited(
+    aws: List[Awaitable[Any]], return_exceptions: bool = False
+) -> List[Any]:
+    """
+    Run awaitables concurrently with at most MSB_POOL_SIZE of them in flight.
+
+    Keeping the number of concurrent requests within the connection pool size avoids
+    opening a burst of connections that would only queue up behind the pool limit.
+
+    Args:
+        aws: Awaitables to run
+        return_exceptions: Return exceptions in the results instead of raising the first one
+
+    Returns:
+        The results in the same order as the awaitables
+    """
+    semaphore = asyncio.Semaphore(
+        int(os.environ.get("MSB_POOL_SIZE", _DEFAULT_POOL_SIZE))
+    )
+
+    async def limited(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(
+        *(limited(aw) for aw in aws), return_exceptions=return_exceptions
+    )
+
+
+def _json_dumps(data: Any) -> bytes:
+    """
+    Serialize a JSON-RPC payload, using orjson when it is installed.
+
+    Falls back to the standard library for data orjson rejects, such as strings
+    containing lone surrogates, which the standard library escapes.
+
+    Args:
+        data: JSON-serializable payload
+
+    Returns:
+        The UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+    """
+    Deserialize a JSON-RPC response body, using orjson when it is installed.
+
+    Args:
+        data: UTF-8 encoded JSON document
+
+    Returns:
+        The decoded JSON value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _decode_response(data: bytes, error_message: str) -> Any:
+    """
+    Decode a JSON-RPC response body, reporting malformed bodies as request failures.
+
+    Args:
+        data: Response body
+        error_message: Message prefix for the raised error
+
+    Returns:
+        The decoded JSON value
+
+    Raises:
+        RuntimeError: If the body is not valid JSON, e.g. an HTML page from a proxy
+    """
+    try:
+        return _json_loads(data)
+    except ValueError as e:
+        raise RuntimeError(f"{error_message}: invalid JSON response") from e
+
+
+def _is_session_closed(session: Any, transport: str) -> bool:
+    """
+    Check whether an HTTP session has been closed.
+
+    Args:
+        session: aiohttp client session or httpx async client
+        transport: Transport the session belongs to
+
+    Returns:
+        True if the session can no longer be used
+    """
+    return session.is_closed if transport == "httpx" else session.closed
+
+
+async def _close_http_session(session: Any, transport: str) -> None:
+    """
+    Close an HTTP session.
+
+    Args:
+        session: aiohttp client session or httpx async client
+        transport: Transport the session belongs to
+    """
+    if transport == "httpx":
+        await session.aclose()
+    else:
+        await session.close()
+
+
+def _session_transport(session: Any) -> str:
+    """
+    Get the transport name for a caller-provided HTTP session.
+
+    Args:
+        session: aiohttp client session or httpx async client
+
+    Returns:
+        "aiohttp" or "httpx"
+    """
+    # A caller holding an aiohttp session has already imported aiohttp
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None and isinstance(session, aiohttp.ClientSession):
+        return "aiohttp"
+    return "httpx"
+
+
+async def _close_shared_sessions(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Close the shared HTTP sessions of an event loop.
+
+    Args:
+        loop: The event loop the sessions were created on, which must be running
+    """
+    for key in list(_LOOP_SESSIONS):
+        if key[0] is not loop:
+            continue
+
+        session = _LOOP_SESSIONS.pop(key, None)
+        if session is not None and not _is_session_closed(session, key[1]):
+            await _close_http_session(session, key[1])
+
+
+async def _guard_shared_sessions() -> AsyncGenerator[None, None]:
+    """
+    Close the running loop's shared sessions when the loop finalizes this generator.
+
+    asyncio.run() finalizes pending async generators after the tasks left over by its
+    coroutine have been cancelled and have finished, but before it closes the loop, so
+    sandboxes stopped during that cancellation can still use the sessions.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        yield
+    finally:
+        _LOOP_SESSION_GUARDS.pop(loop, None)
+        await _close_shared_sessions(loop)
+
+
+async def _acquire_session(
+    transport: str = "aiohttp", pool_size: Optional[int] = None
+) -> Any:
+    """
+    Get the HTTP session shared by sandboxes on the running event loop, creating it on first use.
+
+    Reusing one session keeps connections to the server alive across sandboxes
+    instead of paying a new TCP handshake for every sandbox. The session stays open
+    until the loop shuts down.
+
+    Args:
+        transport: HTTP transport to get the session for ("aiohttp" or "httpx")
+        pool_size: Connection pool size used if the session has to be created
+
+    Returns:
+        The shared HTTP session
+    """
+    loop = asyncio.get_running_loop()
+
+    # Sessions of loops that closed without shutting down their async generators can't
+    # be closed any more; forget them so they don't accumulate
+    for closed_loop in [key for key in list(_LOOP_SESSION_GUARDS) if key.is_closed()]:
+        _LOOP_SESSION_GUARDS.pop(closed_loop, None)
+    for key in [key for key in list(_LOOP_SESSIONS) if key[0].is_closed()]:
+        _LOOP_SESSIONS.pop(key, None)
+
+    key = (loop, transport)
+    session = _LOOP_SESSIONS.get(key)
+    if session is None or _is_session_closed(session, transport):
+        session = _create_session(transport, pool_size)
+        _LOOP_SESSIONS[key] = session
+
+    if loop not in _LOOP_SESSION_GUARDS:
+        # Starting the generator registers it with the loop's async generator hooks
+        guard = _guard_shared_sessions()
+        await guard.__anext__()
+        _LOOP_SESSION_GUARDS[loop] = guard
+
+    return session
+
+
+@atexit.register
+def _close_loop_sessions() -> None:
+    """
+    Close shared HTTP sessions of event loops that were never shut down.
+
+    Only sessions whose event loop is idle and still open can be closed here; the
+    others are bound to a loop that is gone. Caller-provided sessions are left for
+    their owner to close.
+    """
+    for loop, guard in list(_LOOP_SESSION_GUARDS.items()):
+        if loop.is_closed() or loop.is_running():
+            continue
+
+        # Ignore errors during interpreter shutdown
+        try:
+            loop.run_until_complete(guard.aclose())
+        except Exception:
+            pass
+
+    _LOOP_SESSION_GUARDS.clear()
+    _LOOP_SESSIONS.clear()
+
 
 class BaseSandbox(ABC):
     """
@@ -24,12 +410,19 @@ class BaseSandbox(ABC):
     It handles common functionality like sandbox creation, management, and communication.
     """
 
+    # Language identifier sent with sandbox.repl.run requests
+    _language: str
+
     def __init__(
         self,
         server_url: str = None,
         namespace: str = "default",
         name: Optional[str] = None,
         api_key: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        enable_cache: bool = False,
+        transport: str = "aiohttp",
+        coalesce: bool = False,
     ):
         """
         Initialize a base sandbox instance.
@@ -39,14 +432,17 @@ class BaseSandbox(ABC):
             namespace: Namespace for the sandbox
             name: Optional name for the sandbox. If not provided, a random name will be generated.
             api_key: API key for Microsandbox server authentication. If not provided, it will be read from MSB_API_KEY environment variable.
+            pool_size: Optional connection pool size for the HTTP session shared by sandboxes on the running event loop, used if the session has to be created. If not provided, it will be read from the MSB_POOL_SIZE environment variable.
+            enable_cache: Whether to cache executions by code and return the cached result when the same code is run again. Only safe for code without side effects.
+            transport: HTTP transport to use, either "aiohttp" or "httpx". The httpx transport uses HTTP/2 when the server supports it and requires the http2 extra.
+            coalesce: Whether to send run() calls issued within a short window as a single batch request instead of one request each.
         """
-        # Only try to load .env if MSB_API_KEY is not already set
-        if "MSB_API_KEY" not in os.environ:
-            # Ignore errors if .env file doesn't exist
-            try:
-                load_dotenv()
-            except Exception:
-                pass
+        if transport not in _TRANSPORTS:
+            raise ValueError(
+                f"Unsupported transport: {transport}. Expected one of {_TRANSPORTS}"
+            )
+
+        _load_dotenv_once()
 
         self._server_url = server_url or os.environ.get(
             "MSB_SERVER_URL", "http://127.0.0.1:5555"
@@ -54,19 +450,179 @@ class BaseSandbox(ABC):
         self._namespace = namespace
         self._name = name or f"sandbox-{uuid.uuid4().hex[:8]}"
         self._api_key = api_key or os.environ.get("MSB_API_KEY")
+        self._headers = {"Content-Type": "application/json"}
+        if self._api_key:
+            self._headers["Authorization"] = f"Bearer {self._api_key}"
+        # Parameters identifying this sandbox, shared by every request it sends
+        self._rpc_params = {"sandbox": self._name, "namespace": self._namespace}
+        # Encoded start of every sandbox.repl.run request, built on the first run
+        self._run_body_prefix: Optional[bytes] = None
+        self._pool_size = pool_size
+        self._transport = transport
         self._session = None
+        self._shares_session = False
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
         self._is_started = False
+        self._enable_cache = enable_cache
+        self._run_cache: "OrderedDict[str, Execution]" = OrderedDict()
+        self._coalesce = coalesce
+        self._max_retries = _MAX_RETRIES
+        self._base_backoff = _BASE_BACKOFF
+        # Runs waiting to be sent in the next coalesced batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
 
+    @classmethod
     @abstractmethod
-    async def get_default_image(self) -> str:
+    def get_default_image(cls) -> str:
         """
         Get the default Docker image for this sandbox type.
 
+        Overrides may also be declared ``async``; ``start()`` awaits the result.
+
         Returns:
             A string containing the Docker image name and tag
         """
         pass
 
+    @staticmethod
+    def _next_id() -> str:
+        """
+        Get a new JSON-RPC request id.
+
+        Returns:
+            A process-unique request id
+        """
+        return str(next(_RPC_IDS))
+
+    def _build_request(self, method: str, **params: Any) -> Dict[str, Any]:
+        """
+        Build a JSON-RPC request addressed to this sandbox.
+
+        Args:
+            method: JSON-RPC method name
+            **params: Method parameters in addition to the sandbox name and namespace
+
+        Returns:
+            The JSON-RPC request object
+        """
+        return {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": {**self._rpc_params, **params},
+            "id": self._next_id(),
+        }
+
+    def _build_run_body(self, code: str, request_id: str) -> bytes:
+        """
+        Build the encoded sandbox.repl.run request for a code snippet.
+
+        Only the code needs to be serialized; the rest of the request is the same for
+        every run and is taken from a prefix encoded once per sandbox.
+
+        Args:
+            code: Code to execute
+            request_id: JSON-RPC request id, as returned by _next_id()
+
+        Returns:
+            The JSON-RPC request encoded as bytes
+
+        Raises:
+            NotImplementedError: If the sandbox class does not define _language
+        """
+        prefix = self._run_body_prefix
+        if prefix is None:
+            language = getattr(self, "_language", None)
+            if language is None:
+                raise NotImplementedError(
+                    f"{type(self).__name__} must set _language to run code"
+                )
+            prefix = self._run_body_prefix = b"".join(
+                (
+                    b'{"jsonrpc":"2.0","method":"sandbox.repl.run","params":{"sandbox":',
+                    _json_dumps(self._name),
+                    b',"namespace":',
+                    _json_dumps(self._namespace),
+                    b',"language":',
+                    _json_dumps(language),
+                    b',"code":',
+                )
+            )
+        return b"".join(
+            (
+                prefix,
+                _json_dumps(code),
+                b'},"id":"',
+                request_id.encode(),
+                b'"}',
+            )
+        )
+
+    @classmethod
+    def configure(cls, session: Optional[Any] = None) -> None:
+        """
+        Configure the HTTP session shared by all sandboxes.
+
+        Args:
+            session: aiohttp client session, or httpx async client for sandboxes using the
+                httpx transport, to use for all server requests. The caller remains
+                responsible for closing it. If not provided, SDK-managed sessions are used
+                and created on first use.
+        """
+        if session is None:
+            _CONFIGURED_SESSIONS.clear()
+            return
+
+        _CONFIGURED_SESSIONS[_session_transport(session)] = session
+
+    @classmethod
+    @asynccontextmanager
+    async def worker_session(
+        cls, transport: str = "aiohttp", pool_size: Optional[int] = None
+    ):
+        """
+        Get the HTTP session shared by every sandbox on the running event loop as an async context manager.
+
+        Sandboxes on one loop share a session whether or not this is used; use it at the
+        top of a worker's coroutine to choose the transport and pool size before the
+        first sandbox is created, or to get the session itself. The session stays open
+        after the context exits and is closed when the loop shuts down.
+
+        Args:
+            transport: HTTP transport to create the session for, either "aiohttp" or "httpx"
+            pool_size: Optional connection pool size, used if the session has to be created.
+                If not provided, it will be read from the MSB_POOL_SIZE environment variable.
+
+        Returns:
+            The shared HTTP session
+        """
+        if transport not in _TRANSPORTS:
+            raise ValueError(
+                f"Unsupported transport: {transport}. Expected one of {_TRANSPORTS}"
+            )
+
+        yield await _acquire_session(transport, pool_size)
+
+    def bind_session(self, session: Any) -> None:
+        """
+        Use the given HTTP session for this sandbox instead of the shared one.
+
+        This is the way to give a sandbox a dedicated connection pool. Must be called
+        before start(). The caller remains responsible for closing the
+        session, and the sandbox's transport is set to match the session type.
+
+        Args:
+            session: aiohttp client session or httpx async client
+        """
+        if self._is_started:
+            raise RuntimeError("Cannot bind a session to a started sandbox")
+
+        self._session = session
+        self._shares_session = False
+        self._session_loop = None
+        self._transport = _session_transport(session)
+
     @classmethod
     @asynccontextmanager
     async def create(
@@ -75,6 +631,10 @@ class BaseSandbox(ABC):
         namespace: str = "default",
         name: Optional[str] = None,
         api_key: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        enable_cache: bool = False,
+        transport: str = "aiohttp",
+        coalesce: bool = False,
     ):
         """
         Create and initialize a new sandbox as an async context manager.
@@ -84,37 +644,181 @@ class BaseSandbox(ABC):
             namespace: Namespace for the sandbox
             name: Optional name for the sandbox. If not provided, a random name will be generated.
             api_key: API key for Microsandbox server authentication. If not provided, it will be read from MSB_API_KEY environment variable.
+            pool_size: Optional connection pool size for the HTTP session shared by sandboxes on the running event loop, used if the session has to be created. If not provided, it will be read from the MSB_POOL_SIZE environment variable.
+            enable_cache: Whether to cache executions by code and return the cached result when the same code is run again. Only safe for code without side effects.
+            transport: HTTP transport to use, either "aiohttp" or "httpx". The httpx transport uses HTTP/2 when the server supports it and requires the http2 extra.
+            coalesce: Whether to send run() calls issued within a short window as a single batch request instead of one request each.
 
         Returns:
-            An instance of the sandbox ready for use
+            An instance of the sandbox ready for use. Unnamed sandboxes are taken from
+            the pool filled by prewarm() when one with the same configuration was started
+            on the running event loop.
         """
-        # Only try to load .env if MSB_API_KEY is not already set
-        if "MSB_API_KEY" not in os.environ:
-            # Ignore errors if .env file doesn't exist
-            try:
-                load_dotenv()
-            except Exception:
-                pass
-
-        sandbox = cls(
-            server_url=server_url,
-            namespace=namespace,
-            name=name,
-            api_key=api_key,
-        )
+        sandbox = None
+        if name is None:
+            warm_sandboxes = _WARM_POOL.get(
+                (
+                    cls,
+                    asyncio.get_running_loop(),
+                    server_url,
+                    namespace,
+                    api_key,
+                    pool_size,
+                    enable_cache,
+                    transport,
+                    coalesce,
+                )
+            )
+            if warm_sandboxes:
+                sandbox = warm_sandboxes.pop()
+
+        if sandbox is None:
+            sandbox = cls(
+                server_url=server_url,
+                namespace=namespace,
+                name=name,
+                api_key=api_key,
+                pool_size=pool_size,
+                enable_cache=enable_cache,
+                transport=transport,
+                coalesce=coalesce,
+            )
         try:
-            # Create HTTP session
-            sandbox._session = aiohttp.ClientSession()
             # Start the sandbox
             await sandbox.start()
             yield sandbox
         finally:
-            # Stop the sandbox
+            # Stop the sandbox and release its session
             await sandbox.stop()
-            # Close the HTTP session
-            if sandbox._session:
-                await sandbox._session.close()
-                sandbox._session = None
+
+    @classmethod
+    async def prewarm(
+        cls,
+        n: int = 2,
+        server_url: str = None,
+        namespace: str = "default",
+        api_key: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        enable_cache: bool = False,
+        transport: str = "aiohttp",
+        coalesce: bool = False,
+    ) -> None:
+        """
+        Start sandboxes ahead of time so that create() can hand them out without waiting.
+
+        Sandboxes are started concurrently and added to a pool for the running event loop.
+        A later create() call on the same loop, without a name and with the same
+        configuration, takes one from the pool instead of starting a new sandbox. Sandboxes
+        prewarmed in one asyncio.run() call are not used by another. Run this in a
+        background task to overlap start-up with other work, and call stop_prewarmed()
+        to release unused sandboxes.
+
+        Args:
+            n: Number of sandboxes to start
+            server_url: URL of the Microsandbox server. If not provided, will check MSB_SERVER_URL environment variable, then fall back to default.
+            namespace: Namespace for the sandboxes
+            api_key: API key for Microsandbox server authentication. If not provided, it will be read from MSB_API_KEY environment variable.
+            pool_size: Optional connection pool size, as for create()
+            enable_cache: Whether to cache executions by code, as for create()
+            transport: HTTP transport to use, either "aiohttp" or "httpx"
+            coalesce: Whether to batch run() calls, as for create()
+
+        Raises:
+            RuntimeError: If a sandbox fails to start
+            TimeoutError: If a sandbox doesn't start within the default timeout
+        """
+        sandboxes = [
+            cls(
+                server_url=server_url,
+                namespace=namespace,
+                api_key=api_key,
+                pool_size=pool_size,
+                enable_cache=enable_cache,
+                transport=transport,
+                coalesce=coalesce,
+            )
+            for _ in range(n)
+        ]
+        results = await _gather_limited(
+            [sandbox.start() for sandbox in sandboxes], return_exceptions=True
+        )
+
+        key = (
+            cls,
+            asyncio.get_running_loop(),
+            server_url,
+            namespace,
+            api_key,
+            pool_size,
+            enable_cache,
+            transport,
+            coalesce,
+        )
+        pool = _WARM_POOL.setdefault(key, [])
+        for sandbox, result in zip(sandboxes, results):
+            if not isinstance(result, BaseException):
+                pool.append(sandbox)
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    @classmethod
+    async def stop_prewarmed(cls) -> None:
+        """
+        Stop all sandboxes of this type started by prewarm() that have not been used,
+        including ones prewarmed on other event loops.
+
+        Raises:
+            RuntimeError: If a sandbox fails to stop
+        """
+        sandboxes = []
+        for key in [key for key in _WARM_POOL if key[0] is cls]:
+            sandboxes.extend(_WARM_POOL.pop(key))
+
+        await cls.stop_many(sandboxes)
+
+    @classmethod
+    async def stop_many(cls, sandboxes: List["BaseSandbox"]) -> None:
+        """
+        Stop several sandboxes concurrently.
+
+        At most MSB_POOL_SIZE stop requests are in flight at a time. Every sandbox is
+        stopped even if some of them fail.
+
+        Args:
+            sandboxes: Sandboxes to stop
+
+        Raises:
+            RuntimeError: If a sandbox fails to stop
+        """
+        results = await _gather_limited(
+            [sandbox.stop() for sandbox in sandboxes], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    @classmethod
+    async def run_many_sandboxes(
+        cls, sandboxes: List["BaseSandbox"], code: str
+    ) -> List[Execution]:
+        """
+        Execute the same code in several sandboxes concurrently.
+
+        At most MSB_POOL_SIZE requests are in flight at a time.
+
+        Args:
+            sandboxes: Started sandboxes to run the code in
+            code: Code to execute
+
+        Returns:
+            A list of Execution objects, one for each sandbox in the same order
+
+        Raises:
+            RuntimeError: If a sandbox is not started or execution fails
+        """
+        return await _gather_limited([sandbox.run(code) for sandbox in sandboxes])
 
     async def start(
         self,
@@ -139,63 +843,46 @@ class BaseSandbox(ABC):
         if self._is_started:
             return
 
-        sandbox_image = image or await self.get_default_image()
-        request_data = {
-            "jsonrpc": "2.0",
-            "method": "sandbox.start",
-            "params": {
-                "namespace": self._namespace,
-                "sandbox": self._name,
-                "config": {
-                    "image": sandbox_image,
-                    "memory": memory,
-                    "cpus": int(round(cpus)),
-                },
-            },
-            "id": str(uuid.uuid4()),
-        }
+        sandbox_image = image or self.get_default_image()
+        # Subclasses written against the earlier async signature return a coroutine
+        if inspect.isawaitable(sandbox_image):
+            sandbox_image = await sandbox_image
 
-        headers = {"Content-Type": "application/json"}
-        if self._api_key:
-            headers["Authorization"] = f"Bearer {self._api_key}"
+        await self._acquire_session()
 
         try:
             # Set a client-side timeout that's a bit longer than the server-side timeout
             # to account for network latency and processing time
-            client_timeout = aiohttp.ClientTimeout(total=timeout + 30)
-
-            async with self._session.post(
-                f"{self._server_url}/api/v1/rpc",
-                json=request_data,
-                headers=headers,
-                timeout=client_timeout,
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise RuntimeError(f"Failed to start sandbox: {error_text}")
-
-                response_data = await response.json()
-                if "error" in response_data:
-                    raise RuntimeError(
-                        f"Failed to start sandbox: {response_data['error']['message']}"
-                    )
+            result = await self._rpc(
+                "sandbox.start",
+                {
+                    "config": {
+                        "image": sandbox_image,
+                        "memory": memory,
+                        "cpus": int(round(cpus)),
+                    }
+                },
+                "Failed to start sandbox",
+                timeout=timeout + 30,
+            )
+        except TimeoutError as e:
+            await self._close_session()
+            raise TimeoutError(
+                f"Timed out waiting for sandbox to start after {timeout} seconds"
+            ) from e
+        except BaseException:
+            await self._close_session()
+            raise
 
-                # Check the result message - it might indicate the sandbox is still initializing
-                result = response_data.get("result", "")
-                if isinstance(result, str) and "timed out waiting" in result:
-                    # Server timed out but still started the sandbox
-                    # We'll raise a warning but still consider it started
-                    import warnings
+        # Check the result message - it might indicate the sandbox is still initializing
+        if isinstance(result, str) and "timed out waiting" in result:
+            # Server timed out but still started the sandbox
+            # We'll raise a warning but still consider it started
+            import warnings
 
-                    warnings.warn(f"Sandbox start warning: {result}")
+            warnings.warn(f"Sandbox start warning: {result}")
 
-                self._is_started = True
-        except aiohttp.ClientError as e:
-            if isinstance(e, asyncio.TimeoutError):
-                raise TimeoutError(
-                    f"Timed out waiting for sandbox to start after {timeout} seconds"
-                ) from e
-            raise RuntimeError(f"Failed to communicate with Microsandbox server: {e}")
+        self._is_started = True
 
     async def stop(self) -> None:
         """
@@ -205,54 +892,451 @@ class BaseSandbox(ABC):
             RuntimeError: If the sandbox fails to stop
         """
         if not self._is_started:
+            await self._close_session()
             return
 
-        request_data = {
-            "jsonrpc": "2.0",
-            "method": "sandbox.stop",
-            "params": {"namespace": self._namespace, "sandbox": self._name},
-            "id": str(uuid.uuid4()),
-        }
+        # The session may belong to another event loop, e.g. for a sandbox started
+        # in an earlier asyncio.run() call; switch to one usable on this loop
+        if (
+            self._session_loop is not None
+            and self._session_loop is not asyncio.get_running_loop()
+        ):
+            await self._close_session()
+            await self._acquire_session()
 
-        headers = {"Content-Type": "application/json"}
-        if self._api_key:
-            headers["Authorization"] = f"Bearer {self._api_key}"
+        try:
+            await self._rpc(
+                "sandbox.stop", error_message="Failed to stop sandbox", idempotent=True
+            )
+            self._is_started = False
+        finally:
+            if not self._is_started:
+                await self._close_session()
+
+    async def _acquire_session(self) -> None:
+        """
+        Get an HTTP session for this sandbox if it doesn't have one yet.
+
+        Uses the session passed to configure(), otherwise the one shared by sandboxes
+        on the running event loop, sized by pool_size if it has to be created.
+        """
+        if self._session is not None:
+            return
+
+        if self._transport in _CONFIGURED_SESSIONS:
+            self._session = _CONFIGURED_SESSIONS[self._transport]
+            return
+
+        self._session = await _acquire_session(self._transport, self._pool_size)
+        self._shares_session = True
+        self._session_loop = asyncio.get_running_loop()
+
+    async def _close_session(self) -> None:
+        """
+        Release the shared HTTP session, which stays open for other sandboxes on the
+        loop. Caller-provided sessions are left open.
+        """
+        if self._session is None or not self._shares_session:
+            return
+
+        self._session = None
+        self._shares_session = False
+        self._session_loop = None
+
+    async def _rpc(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        error_message: str = "Request failed",
+        timeout: Optional[float] = None,
+        idempotent: bool = False,
+    ) -> Any:
+        """
+        Call a JSON-RPC method on this sandbox and return its result.
+
+        Args:
+            method: JSON-RPC method name
+            params: Method parameters in addition to the sandbox name and namespace
+            error_message: Message prefix for errors raised by this call
+            timeout: Optional total timeout in seconds, overriding the session default
+            idempotent: Whether the call is safe to repeat, as for _post()
+
+        Returns:
+            The result of the call
+
+        Raises:
+            RuntimeError: If the request fails or the server returns an error
+            TimeoutError: If the request times out
+        """
+        request_data = self._build_request(method, **(params or {}))
+        response_data = await self._post(
+            request_data, error_message, timeout=timeout, idempotent=idempotent
+        )
+        return self._rpc_result(response_data, error_message)
+
+    @staticmethod
+    def _rpc_result(response_data: Dict[str, Any], error_message: str) -> Any:
+        """
+        Get the result from a JSON-RPC response, raising its error if there is one.
+
+        Args:
+            response_data: Decoded JSON-RPC response object
+            error_message: Message prefix for the raised error
+
+        Returns:
+            The result of the call, or an empty dict if the response has none
+
+        Raises:
+            RuntimeError: If the response contains an error
+        """
+        if "error" in response_data:
+            raise RuntimeError(f"{error_message}: {response_data['error']['message']}")
+
+        return response_data.get("result", {})
+
+    async def _post(
+        self,
+        request_data: Any,
+        error_message: str,
+        timeout: Optional[float] = None,
+        idempotent: bool = False,
+    ) -> Any:
+        """
+        Send a JSON-RPC payload to the server using the configured transport.
+
+        Failures that happen before the server processes the request, a refused
+        connection or a 503 status, are retried up to _max_retries times with jittered
+        exponential backoff. A connection dropped by the server may happen after the
+        request was received, so it is only retried for idempotent requests. Timeouts
+        are never retried, since the server may still be executing the request.
+
+        Args:
+            request_data: JSON-RPC request object, a list of them for a batch, or an
+                already encoded request body
+            error_message: Message prefix for errors raised by this request
+            timeout: Optional total timeout in seconds, overriding the session default
+            idempotent: Whether the request is safe to send again if the connection
+                drops, e.g. stopping a sandbox or reading metrics
+
+        Returns:
+            The decoded JSON response body
+
+        Raises:
+            RuntimeError: If the server cannot be reached or returns a non-200 status
+            TimeoutError: If the request times out
+        """
+        if isinstance(request_data, bytes):
+            body = request_data
+        else:
+            body = _json_dumps(request_data)
+
+        attempt = 0
+        while True:
+            try:
+                return await self._post_once(body, error_message, timeout)
+            except _RetryableError as e:
+                if attempt >= self._max_retries or (
+                    isinstance(e, _DisconnectedError) and not idempotent
+                ):
+                    raise RuntimeError(str(e)) from e.__cause__
+
+            delay = min(self._base_backoff * 2**attempt, _MAX_BACKOFF)
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            attempt += 1
+
+    async def _post_once(
+        self, body: bytes, error_message: str, timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Send an encoded JSON-RPC payload to the server once.
+
+        Args:
+            body: Encoded JSON-RPC request body
+            error_message: Message prefix for errors raised by this request
+            timeout: Optional total timeout in seconds, overriding the session default
+
+        Returns:
+            The decoded JSON response body
+
+        Raises:
+            _RetryableError: If the request failed before the server processed it
+            _DisconnectedError: If the connection dropped after the request may have been sent
+            RuntimeError: If the request fails otherwise or returns a non-200 status
+            TimeoutError: If the request times out
+        """
+        url = f"{self._server_url}/api/v1/rpc"
+
+        if self._transport == "httpx":
+            import httpx
+
+            try:
+                response = await self._session.post(
+                    url,
+                    content=body,
+                    headers=self._headers,
+                    timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+                )
+            except httpx.TimeoutException as e:
+                raise TimeoutError(f"{error_message}: request timed out") from e
+            except httpx.ConnectError as e:
+                raise _RetryableError(f"{error_message}: {e}") from e
+            except httpx.RemoteProtocolError as e:
+                raise _DisconnectedError(f"{error_message}: {e}") from e
+            except httpx.HTTPError as e:
+                raise RuntimeError(f"{error_message}: {e}") from e
+
+            if response.status_code in _RETRYABLE_STATUSES:
+                raise _RetryableError(f"{error_message}: {response.text}")
+            if response.status_code != 200:
+                raise RuntimeError(f"{error_message}: {response.text}")
+
+            return _decode_response(response.content, error_message)
+
+        aiohttp = _get_aiohttp()
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
 
         try:
             async with self._session.post(
-                f"{self._server_url}/api/v1/rpc",
-                json=request_data,
-                headers=headers,
+                url, data=body, headers=self._headers, **kwargs
             ) as response:
                 if response.status != 200:
                     error_text = await response.text()
-                    raise RuntimeError(f"Failed to stop sandbox: {error_text}")
-
-                response_data = await response.json()
-                if "error" in response_data:
-                    raise RuntimeError(
-                        f"Failed to stop sandbox: {response_data['error']['message']}"
-                    )
+                    if response.status in _RETRYABLE_STATUSES:
+                        raise _RetryableError(f"{error_message}: {error_text}")
+                    raise RuntimeError(f"{error_message}: {error_text}")
 
-                self._is_started = False
+                data = await response.read()
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(f"{error_message}: request timed out") from e
+        except aiohttp.ClientConnectorError as e:
+            raise _RetryableError(f"{error_message}: {e}") from e
+        except aiohttp.ServerDisconnectedError as e:
+            raise _DisconnectedError(f"{error_message}: {e}") from e
         except aiohttp.ClientError as e:
-            raise RuntimeError(f"Failed to communicate with Microsandbox server: {e}")
+            raise RuntimeError(f"{error_message}: {e}") from e
 
-    @abstractmethod
-    async def run(self, code: str):
+        return _decode_response(data, error_message)
+
+    async def run(self, code: str) -> Execution:
         """
-        Execute code in the sandbox.
+        Execute code in the sandbox using the sandbox's language.
 
         Args:
             code: Code to execute
 
         Returns:
-            An Execution object representing the executed code
+            An Execution object that represents the executed code
+
+        Raises:
+            RuntimeError: If the sandbox is not started or execution fails
+        """
+        if not self._is_started:
+            raise RuntimeError("Sandbox is not started. Call start() first.")
+
+        cached = self._get_cached_execution(code)
+        if cached is not None:
+            return cached
+
+        if self._coalesce:
+            execution = await self._run_coalesced(code)
+        else:
+            response_data = await self._post(
+                self._build_run_body(code, self._next_id()), "Failed to execute code"
+            )
+            execution = Execution(
+                output_data=self._rpc_result(response_data, "Failed to execute code")
+            )
+
+        self._cache_execution(code, execution)
+        return execution
+
+    def invalidate_cache(self) -> None:
+        """
+        Discard all executions cached by run().
+        """
+        self._run_cache.clear()
+
+    def _get_cached_execution(self, code: str) -> Optional[Execution]:
+        """
+        Look up a cached execution for the given code.
+
+        Args:
+            code: Code that is about to be executed
+
+        Returns:
+            The cached Execution, or None if caching is disabled or there is no entry
+        """
+        if not self._enable_cache:
+            return None
+
+        execution = self._run_cache.get(code)
+        if execution is not None:
+            self._run_cache.move_to_end(code)
+        return execution
+
+    def _cache_execution(self, code: str, execution: Execution) -> None:
+        """
+        Store a successful execution in the run cache, evicting the least recently used entry.
+
+        Args:
+            code: Code that was executed
+            execution: Execution result for the code
+        """
+        if not self._enable_cache or execution.has_error():
+            return
+
+        self._run_cache[code] = execution
+        self._run_cache.move_to_end(code)
+        if len(self._run_cache) > _RUN_CACHE_SIZE:
+            self._run_cache.popitem(last=False)
+
+    async def _run_batch(self, codes: List[str]) -> List[Dict[str, Any]]:
+        """
+        Send code snippets as one JSON-RPC batch of sandbox.repl.run requests.
+
+        Args:
+            codes: Code snippets to execute
+
+        Returns:
+            The JSON-RPC response for each snippet in the same order
+
+        Raises:
+            RuntimeError: If the request fails or the batch response is incomplete
+        """
+        request_ids = [self._next_id() for _ in codes]
+        body = b"".join(
+            (
+                b"[",
+                b",".join(
+                    self._build_run_body(code, request_id)
+                    for code, request_id in zip(codes, request_ids)
+                ),
+                b"]",
+            )
+        )
+
+        response_data = await self._post(body, "Failed to execute code")
+        if not isinstance(response_data, list):
+            raise RuntimeError(
+                f"Failed to execute code: unexpected batch response: {response_data}"
+            )
+
+        # Batch responses are matched to requests by id, as their order is not guaranteed
+        responses = {item.get("id"): item for item in response_data}
+
+        items = []
+        for request_id in request_ids:
+            item = responses.get(request_id)
+            if item is None:
+                raise RuntimeError("Failed to execute code: missing response in batch")
+            items.append(item)
+
+        return items
+
+    async def run_many(self, codes: List[str]) -> List[Execution]:
+        """
+        Execute several code snippets in the sandbox with a single request.
+
+        The snippets are sent as one JSON-RPC batch and executed in order, so later
+        snippets can use state defined by earlier ones.
+
+        A snippet the server fails to execute does not raise: its Execution has an
+        error status and the server's error message as stderr, so the results of the
+        other snippets are kept. Check each result with has_error().
+
+        Args:
+            codes: Code snippets to execute
+
+        Returns:
+            A list of Execution objects, one for each snippet in the same order
+
+        Raises:
+            RuntimeError: If the sandbox is not started or the batch request fails
+        """
+        if not self._is_started:
+            raise RuntimeError("Sandbox is not started. Call start() first.")
+
+        if not codes:
+            return []
+
+        executions = []
+        for item in await self._run_batch(codes):
+            if "error" in item:
+                output_data = {
+                    "status": "error",
+                    "language": self._language,
+                    "output": [
+                        {
+                            "stream": "stderr",
+                            "text": f"Failed to execute code: {item['error']['message']}",
+                        }
+                    ],
+                }
+            else:
+                output_data = item.get("result", {})
+            executions.append(Execution(output_data=output_data))
+
+        return executions
+
+    async def _run_coalesced(self, code: str) -> Execution:
+        """
+        Queue code to be sent with other runs issued within the coalescing window.
+
+        Args:
+            code: Code to execute
+
+        Returns:
+            An Execution object that represents the executed code
 
         Raises:
             RuntimeError: If execution fails
         """
-        pass
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((code, future))
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(_COALESCE_WINDOW, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """
+        Send all queued runs as a single batch.
+        """
+        pending, self._pending = self._pending, []
+        self._flush_handle = None
+        # Keep a reference so the task isn't garbage collected before it completes
+        task = asyncio.ensure_future(self._send_pending(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_pending(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        """
+        Execute queued runs in one batch and resolve their futures.
+
+        Args:
+            pending: Queued code snippets with the futures awaiting their results
+        """
+        try:
+            items = await self._run_batch([code for code, _ in pending])
+        except BaseException as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), item in zip(pending, items):
+            if future.done():
+                continue
+            try:
+                result = self._rpc_result(item, "Failed to execute code")
+            except RuntimeError as e:
+                future.set_exception(e)
+            else:
+                future.set_result(Execution(output_data=result))
 
     @property
     def command(self):
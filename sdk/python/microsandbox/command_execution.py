@@ -57,10 +57,11 @@ class CommandExecution:
             String containing the stdout output of the command
         """
         # Combine the stdout output lines into a single string
-        output_text = ""
-        for line in self._output_lines:
-            if isinstance(line, dict) and line.get("stream") == "stdout":
-                output_text += line.get("text", "") + "\n"
+        output_text = "\n".join(
+            line.get("text", "")
+            for line in self._output_lines
+            if isinstance(line, dict) and line.get("stream") == "stdout"
+        )
 
         return output_text.rstrip()
 
@@ -72,10 +73,11 @@ class CommandExecution:
             String containing the stderr output of the command
         """
         # Combine the stderr output lines into a single string
-        error_text = ""
-        for line in self._output_lines:
-            if isinstance(line, dict) and line.get("stream") == "stderr":
-                error_text += line.get("text", "") + "\n"
+        error_text = "\n".join(
+            line.get("text", "")
+            for line in self._output_lines
+            if isinstance(line, dict) and line.get("stream") == "stderr"
+        )
 
         return error_text.rstrip()
 
@@ -10,7 +10,8 @@ class Execution:
     Represents a code execution in a sandbox environment.
 
     This class provides access to the results and output of code
-    that was executed in a sandbox.
+    that was executed in a sandbox. The output is delivered with the
+    sandbox.repl.run response, so reading it makes no further requests.
     """
 
     def __init__(
@@ -28,6 +29,10 @@ class Execution:
         self._language = "unknown"
         self._has_error = False
 
+        # Output strings are assembled on first access and reused afterwards
+        self._output_text: Optional[str] = None
+        self._error_text: Optional[str] = None
+
         # Process output data if provided
         if output_data and isinstance(output_data, dict):
             self._process_output_data(output_data)
@@ -67,13 +72,17 @@ class Execution:
         Returns:
             String containing the stdout output of the execution
         """
-        # Combine the stdout output lines into a single string
-        output_text = ""
-        for line in self._output_lines:
-            if isinstance(line, dict) and line.get("stream") == "stdout":
-                output_text += line.get("text", "") + "\n"
+        if self._output_text is None:
+            # Combine the stdout output lines into a single string
+            output_text = "\n".join(
+                line.get("text", "")
+                for line in self._output_lines
+                if isinstance(line, dict) and line.get("stream") == "stdout"
+            )
+
+            self._output_text = output_text.rstrip()
 
-        return output_text.rstrip()
+        return self._output_text
 
     async def error(self) -> str:
         """
@@ -82,13 +91,17 @@ class Execution:
         Returns:
             String containing the stderr output of the execution
         """
-        # Combine the stderr output lines into a single string
-        error_text = ""
-        for line in self._output_lines:
-            if isinstance(line, dict) and line.get("stream") == "stderr":
-                error_text += line.get("text", "") + "\n"
+        if self._error_text is None:
+            # Combine the stderr output lines into a single string
+            error_text = "\n".join(
+                line.get("text", "")
+                for line in self._output_lines
+                if isinstance(line, dict) and line.get("stream") == "stderr"
+            )
+
+            self._error_text = error_text.rstrip()
 
-        return error_text.rstrip()
+        return self._error_text
 
     def has_error(self) -> bool:
         """
@@ -2,7 +2,6 @@
 Metrics interface for the Microsandbox Python SDK.
 """
 
-import uuid
 from typing import Optional
 
 
@@ -36,48 +35,19 @@ class Metrics:
         if not self._sandbox._is_started:
             raise RuntimeError("Sandbox is not started. Call start() first.")
 
-        headers = {"Content-Type": "application/json"}
-        if self._sandbox._api_key:
-            headers["Authorization"] = f"Bearer {self._sandbox._api_key}"
-
-        # Prepare the request data
-        request_data = {
-            "jsonrpc": "2.0",
-            "method": "sandbox.metrics.get",
-            "params": {
-                "namespace": self._sandbox._namespace,
-                "sandbox": self._sandbox._name,
-            },
-            "id": str(uuid.uuid4()),
-        }
-
-        try:
-            async with self._sandbox._session.post(
-                f"{self._sandbox._server_url}/api/v1/rpc",
-                json=request_data,
-                headers=headers,
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise RuntimeError(f"Failed to get sandbox metrics: {error_text}")
-
-                response_data = await response.json()
-                if "error" in response_data:
-                    raise RuntimeError(
-                        f"Failed to get sandbox metrics: {response_data['error']['message']}"
-                    )
-
-                result = response_data.get("result", {})
-                sandboxes = result.get("sandboxes", [])
-
-                # We expect exactly one sandbox in the response (our own)
-                if not sandboxes:
-                    return {}
-
-                # Return the first (and should be only) sandbox data
-                return sandboxes[0]
-        except Exception as e:
-            raise RuntimeError(f"Failed to get sandbox metrics: {e}")
+        result = await self._sandbox._rpc(
+            "sandbox.metrics.get",
+            error_message="Failed to get sandbox metrics",
+            idempotent=True,
+        )
+        sandboxes = result.get("sandboxes", [])
+
+        # We expect exactly one sandbox in the response (our own)
+        if not sandboxes:
+            return {}
+
+        # Return the first (and should be only) sandbox data
+        return sandboxes[0]
 
     async def all(self) -> dict:
         """